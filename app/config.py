@@ -0,0 +1,20 @@
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+# .env читается один раз здесь; дальше все настройки - атрибуты
+# замороженного объекта, без повторных обращений к os.environ
+load_dotenv()
+
+@dataclass(frozen=True)
+class Settings:
+    secret_key: str = os.getenv("SECRET_KEY", "fallback-secret-key-change-me")
+    algorithm: str = "HS256"
+    access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    database_url: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///marketplace.db")
+    sql_echo: bool = os.getenv("SQL_ECHO", "0") == "1"
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    verify_cache_enabled: bool = os.getenv("VERIFY_CACHE", "0") == "1"
+
+settings = Settings()
@@ -1,18 +1,58 @@
+from typing import Annotated, AsyncGenerator
+
+from fastapi import Depends
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.orm import DeclarativeBase
+
+from app.config import settings
 
-engine = create_async_engine('sqlite+aiosqlite:///marketplace.db', echo=True)
+# SQLite остаётся базой по умолчанию; для продакшена задаётся DATABASE_URL
+# вида postgresql+asyncpg://... - тогда включается настройка пула соединений
+if settings.database_url.startswith("sqlite"):
+    engine = create_async_engine(
+        settings.database_url,
+        echo=settings.sql_echo,
+        pool_size=20,
+        max_overflow=10,
+        pool_timeout=10,
+        query_cache_size=1200,
+        connect_args={"check_same_thread": False},
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL не блокирует читателей при записи, synchronous=NORMAL
+        # убирает лишние fsync на каждую транзакцию
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.close()
+else:
+    engine = create_async_engine(
+        settings.database_url,
+        echo=settings.sql_echo,
+        pool_size=20,
+        max_overflow=10,
+        pool_timeout=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        query_cache_size=1200,
+    )
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    pass
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
+
+# Общий Depends(get_session): зависимости и обработчик, объявившие SessionDep,
+# получают одну и ту же сессию в рамках запроса благодаря кэшу зависимостей
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 async def create_tables():
     async with engine.begin() as conn:
@@ -1,17 +1,39 @@
+from typing import Annotated
+
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
 from app.jwt_manager import jwt_manager
-from app.database import get_session
+from app.database import AsyncSessionLocal
 from app.models import User
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> int:
+# Общий Depends(security): FastAPI кэширует зависимости в рамках запроса
+# по идентичности объекта Depends, так что Bearer-токен разбирается один раз
+SecurityDep = Annotated[HTTPAuthorizationCredentials, Depends(security)]
+
+# Короткий кэш актуального статуса админа: user_id -> bool
+# Ограничивает устаревание прав 30 секундами вместо времени жизни токена
+_admin_status_cache = TTLCache(maxsize=1024, ttl=30)
+
+async def _check_admin_in_db(user_id: int) -> bool:
+    cached = _admin_status_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    async with AsyncSessionLocal() as session:
+        user = await session.get(User, user_id)
+
+    is_admin = user is not None and user.is_admin
+    _admin_status_cache[user_id] = is_admin
+    return is_admin
+
+# Обе зависимости намеренно async def: проверка JWT - чистый CPU без await,
+# а sync-зависимости FastAPI отправляет в threadpool, что только добавило бы
+# накладные расходы на переключение потоков
+async def get_current_user(credentials: SecurityDep) -> int:
     """
     Зависимость для получения текущего пользователя из JWT токена
     """
@@ -27,43 +49,33 @@ async def get_current_user(
     
     return user_id
 
-async def get_current_admin(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_session)
-) -> dict:
+async def get_current_admin(credentials: SecurityDep) -> dict:
     """
     Зависимость для проверки, что пользователь - админ
-    Проверяет в БД актуальный статус is_admin
+    Статус is_admin читается из подписанного токена и раз в 30 секунд
+    сверяется с БД, чтобы отзыв прав не ждал истечения токена
     """
     token = credentials.credentials
+    payload = jwt_manager.verify_token(token)
+    # Результат verify_token уже в кэше, так что повторный разбор токена
+    # здесь - лишь поиск по словарю; зато нечисловой sub даёт 401, а не 500
     user_id = jwt_manager.get_user_id_from_token(token)
-    
-    if user_id is None:
+
+    if payload is None or user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Невалидный или истекший токен",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    
-    if not user.is_admin:
+
+    if not payload.get("is_admin") or not await _check_admin_in_db(user_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Требуются права администратора"
         )
-    
+
     return {
-        "user_id": user.id,
-        "username": user.username,
-        "is_admin": user.is_admin
+        "user_id": user_id,
+        "username": payload.get("username"),
+        "is_admin": True
     }
\ No newline at end of file
@@ -1,17 +1,30 @@
-import os
-from datetime import datetime, timedelta
+import base64
+import hashlib
+import hmac
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
+import orjson
+from cachetools import TTLCache
 
-SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key-change-me")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+from app.config import settings
 
 class JWTManager:
     def __init__(self):
-        self.secret_key = SECRET_KEY
-        self.algorithm = ALGORITHM
-        self.access_token_expire_minutes = ACCESS_TOKEN_EXPIRE_MINUTES
+        self.secret_key = settings.secret_key
+        self.algorithm = settings.algorithm
+        self.access_token_expire_minutes = settings.access_token_expire_minutes
+        # Кэш результатов проверки токенов: sha256(токен) -> (payload, exp)
+        self._verify_cache = TTLCache(maxsize=10_000, ttl=60)
+        # Ключ и заголовок {"alg":"HS256","typ":"JWT"} одинаковы для всех
+        # токенов, поэтому кодируем их один раз
+        self._key_bytes = self.secret_key.encode()
+        self._header_b64 = base64.urlsafe_b64encode(
+            orjson.dumps({"alg": self.algorithm, "typ": "JWT"})
+        ).rstrip(b"=")
+        # HMAC-прототип: подготовка ключа (ipad/opad) выполняется один раз,
+        # для каждого токена берётся дешёвая копия
+        self._hmac_proto = hmac.new(self._key_bytes, digestmod=hashlib.sha256)
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         """
@@ -20,23 +33,64 @@ class JWTManager:
         to_encode = data.copy()
         
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = datetime.now(timezone.utc) + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
-        
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
+            expire = datetime.now(timezone.utc) + timedelta(minutes=self.access_token_expire_minutes)
+
+        to_encode.update({"exp": int(expire.timestamp())})
+        payload_b64 = base64.urlsafe_b64encode(orjson.dumps(to_encode)).rstrip(b"=")
+        signing_input = self._header_b64 + b"." + payload_b64
+        mac = self._hmac_proto.copy()
+        mac.update(signing_input)
+        return (signing_input + b"." + base64.urlsafe_b64encode(mac.digest()).rstrip(b"=")).decode()
     
+    # Метод намеренно синхронный: проверка занимает < 1 мс чистого CPU,
+    # и оборачивать её в to_thread/run_in_threadpool - чистый проигрыш,
+    # переключение потока стоит дороже самой проверки
     def verify_token(self, token: str) -> Optional[dict]:
         """
         Проверяет JWT токен и возвращает данные, если токен валиден
         """
+        # Ключ кэша - хеш токена, чтобы не держать сами токены в памяти
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached = self._verify_cache.get(cache_key)
+        if cached is not None:
+            payload, exp = cached
+            if exp > time.time():
+                return payload
+            self._verify_cache.pop(cache_key, None)
+
+        # Сначала дешёвая проверка подписи, и только потом разбор JSON:
+        # на мусорные/поддельные токены JSON-парсер не тратится вообще
+        try:
+            signing_input, _, signature = token.rpartition(".")
+            header_b64, payload_b64 = signing_input.split(".")
+        except ValueError:
+            return None
+
+        mac = self._hmac_proto.copy()
+        mac.update(signing_input.encode())
+        expected = base64.urlsafe_b64encode(mac.digest()).rstrip(b"=")
+        # Сравниваются байты: compare_digest на строках с не-ASCII
+        # символами кидает TypeError, а заголовок может содержать что угодно
+        if not hmac.compare_digest(expected, signature.encode()):
+            return None
+
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
-        except JWTError:
+            payload = orjson.loads(
+                base64.urlsafe_b64decode(payload_b64 + "=" * (-len(payload_b64) % 4))
+            )
+        except (ValueError, orjson.JSONDecodeError):
             return None
+
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or "sub" not in payload:
+            return None
+        if exp <= time.time():
+            return None
+
+        self._verify_cache[cache_key] = (payload, exp)
+        return payload
     
     def get_user_id_from_token(self, token: str) -> Optional[int]:
         """
@@ -45,13 +99,10 @@ class JWTManager:
         payload = self.verify_token(token)
         if payload is None:
             return None
-        
-        user_id = payload.get("sub")
-        if user_id:
-            try:
-                return int(user_id)
-            except (ValueError, TypeError):
-                return None
-        return None
+
+        try:
+            return int(payload["sub"])
+        except (KeyError, TypeError, ValueError):
+            return None
 
 jwt_manager = JWTManager()
\ No newline at end of file
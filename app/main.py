@@ -1,25 +1,64 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from fastapi.staticfiles import StaticFiles
 from sqlalchemy.future import select
 from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import List, Optional
 
-from app.database import get_session, create_tables, AsyncSessionLocal
+from app.database import SessionDep, create_tables, AsyncSessionLocal, engine
 from app.models import User, Product, Seller, Order
 from app.schemas import (
     UserCreate, UserRead, ProductCreate, ProductRead, ProductUpdate,
-    SellerCreate, SellerRead, OrderCreate, OrderRead
+    SellerCreate, SellerRead, OrderCreate, OrderRead, OrderPage
+)
+from app.security import (
+    DUMMY_PASSWORD_HASH, get_password_hash, get_password_hash_async,
+    verify_password_async
 )
-from app.security import get_password_hash, verify_password
 from app.jwt_manager import jwt_manager
 from app.dependencies import get_current_user, get_current_admin
 from app.schemas.auth import Token, LoginRequest, RegisterRequest
 
-from dotenv import load_dotenv
-import os
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import IntegrityError
+
+# INSERT ... ON CONFLICT DO NOTHING поддерживают и SQLite, и PostgreSQL,
+# но конструкция живёт в разных диалектных модулях
+if engine.dialect.name == "sqlite":
+    from sqlalchemy.dialects.sqlite import insert as insert_ignore
+else:
+    from sqlalchemy.dialects.postgresql import insert as insert_ignore
+
+import gzip
+import hashlib
+import logging
+
+from cachetools import TTLCache
+from jinja2 import Environment, FileSystemLoader
+
+logger = logging.getLogger(__name__)
+
+# Статические HTML-страницы отдаются файлами, без прогона через Python-строки
+_STATIC_DIR = Path(__file__).resolve().parent / "static"
 
-load_dotenv()
+# Кэш строки пользователя для /me: профиль меняется редко, 30 секунд
+# устаревания позволяют убрать SELECT из каждого повторного запроса
+_me_cache = TTLCache(maxsize=10_000, ttl=30)
+
+# Предсобранный запрос логина: выражение строится один раз на импорт,
+# а не на каждый POST /login
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Кэш ответов публичных справочных GET-эндпоинтов (каталог и продавцы).
+# Redis в стеке нет, поэтому кэш внутрипроцессный: ключ - id товара или
+# пара (skip, limit), мутации полностью сбрасывают соответствующий кэш.
+# Хранится уже сериализованный payload: pydantic-валидация выполняется
+# один раз при заполнении кэша, а не на каждый запрос; обработчик отдаёт
+# готовый ORJSONResponse, response_model остаётся только для OpenAPI
+_products_cache = TTLCache(maxsize=1024, ttl=60)
+_sellers_cache = TTLCache(maxsize=1024, ttl=60)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -65,21 +104,15 @@ async def lifespan(app: FastAPI):
             {"name": "BookWorld", "commission_percent": 3.5}
         ]
         
-        created_sellers_count = 0
-        for seller_data in default_sellers:
-            result = await session.execute(
-                select(Seller).where(Seller.name == seller_data["name"])
-            )
-            existing_seller = result.scalar_one_or_none()
-            
-            if not existing_seller:
-                seller = Seller(
-                    name=seller_data["name"],
-                    commission_percent=seller_data["commission_percent"]
-                )
-                session.add(seller)
-                created_sellers_count += 1
-        
+        # Одна атомарная вставка: дубликаты отсекает сама БД по уникальному
+        # индексу имени, гонки при параллельном старте воркеров исключены
+        result = await session.execute(
+            insert_ignore(Seller)
+            .values(default_sellers)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        created_sellers_count = result.rowcount
+
         if created_sellers_count > 0:
             await session.commit()
             print(f"\nСоздано {created_sellers_count} продавцов по умолчанию")
@@ -91,10 +124,10 @@ async def lifespan(app: FastAPI):
                 print(f"  - {seller.name} (ID: {seller.id}, комиссия: {seller.commission_percent}%)")
         
         # СОЗДАНИЕ ТЕСТОВЫХ ТОВАРОВ
-        result = await session.execute(select(Product))
-        existing_products = result.scalars().all()
+        result = await session.execute(select(Product.id).limit(1))
+        existing_products = result.scalar_one_or_none()
         
-        if not existing_products:
+        if existing_products is None:
             result = await session.execute(select(Seller.id).limit(1))
             first_seller_id = result.scalar()
             
@@ -105,14 +138,7 @@ async def lifespan(app: FastAPI):
                     {"name": "Наушники Sony WH-1000XM4", "price": 19999.99, "seller_id": first_seller_id}
                 ]
                 
-                for product_data in test_products:
-                    product = Product(
-                        name=product_data["name"],
-                        price=product_data["price"],
-                        seller_id=product_data["seller_id"]
-                    )
-                    session.add(product)
-                
+                await session.execute(insert(Product), test_products)
                 await session.commit()
                 print("\nСозданы тестовые товары для демонстрации")
     
@@ -122,46 +148,48 @@ app = FastAPI(
     title="Marketplace API",
     description="API для маркетплейса с несколькими продавцами",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# HTML-страницы и большие JSON-ответы хорошо сжимаются (~4x)
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+# Общий CSS страниц; браузер закэширует его один раз на все страницы
+app.mount("/static", StaticFiles(directory=_STATIC_DIR), name="static")
+
 # АУТЕНТИФИКАЦИЯ
 @app.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED,
           summary="Регистрация пользователя",
           description="Создание нового пользователя в системе")
 async def register(
     user_data: RegisterRequest,
-    db: AsyncSession = Depends(get_session)
+    db: SessionDep
 ):
-    result = await db.execute(select(User).where(User.email == user_data.email))
-    existing_user_email = result.scalar_one_or_none()
-    
-    if existing_user_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь с таким email уже существует"
-        )
-    
-    result = await db.execute(select(User).where(User.username == user_data.username))
-    existing_user_username = result.scalar_one_or_none()
-    
-    if existing_user_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь с таким именем уже существует"
-        )
-    
     db_user = User(
         username=user_data.username,
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         is_admin=False
     )
-    
+
+    # Уникальность проверяет сама БД: одна попытка INSERT вместо
+    # предварительных SELECT, и нет гонки между проверкой и вставкой
     db.add(db_user)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if "email" in str(exc.orig):
+            detail = "Пользователь с таким email уже существует"
+        else:
+            detail = "Пользователь с таким именем уже существует"
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
     await db.refresh(db_user)
-    
+
     return db_user
 
 @app.post("/login", response_model=Token,
@@ -169,26 +197,35 @@ async def register(
           description="Аутентификация пользователя и получение JWT токена")
 async def login(
     login_data: LoginRequest,
-    db: AsyncSession = Depends(get_session)
+    db: SessionDep
 ):
-    result = await db.execute(select(User).where(User.email == login_data.email))
-    user = result.scalar_one_or_none()
-    
+    result = await db.execute(_USER_BY_EMAIL, {"email": login_data.email})
+    user = result.scalars().first()
+
+    # БД в этом обработчике больше не нужна: возвращаем соединение в пул
+    # сразу, чтобы его не держала ~100 мс проверка bcrypt ниже
+    await db.close()
+
     if not user:
+        # bcrypt выполняется и в этой ветке, чтобы ответ по времени
+        # не отличался от неверного пароля существующего пользователя
+        await verify_password_async(login_data.password, DUMMY_PASSWORD_HASH)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if not verify_password(login_data.password, user.hashed_password):
+    if not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"DEBUG: User {user.username} is_admin = {user.is_admin}")
+    # Ленивое %s-форматирование: при выключенном DEBUG строка не собирается
+    # и синхронной записи в stdout на каждый логин больше нет
+    logger.debug("User %s is_admin=%s", user.username, user.is_admin)
     
     token_data = {
         "sub": str(user.id),
@@ -208,12 +245,15 @@ async def login(
          summary="Информация о текущем пользователе",
          description="Получение информации о текущем аутентифицированном пользователе")
 async def get_current_user_info(
-    current_user_id: int = Depends(get_current_user),
-    db: AsyncSession = Depends(get_session)
+    db: SessionDep,
+    current_user_id: int = Depends(get_current_user)
 ):
-    result = await db.execute(select(User).where(User.id == current_user_id))
-    user = result.scalar_one_or_none()
-    
+    user = _me_cache.get(current_user_id)
+    if user is None:
+        user = await db.get(User, current_user_id)
+        if user is not None:
+            _me_cache[current_user_id] = user
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -227,35 +267,45 @@ async def get_current_user_info(
          summary="Получить список товаров",
          description="Возвращает список всех товаров с пагинацией. Доступно всем.")
 async def get_products(
+    db: SessionDep,
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_session)
+    limit: int = Query(100, ge=1, le=500)
 ):
-    result = await db.execute(
-        select(Product).offset(skip).limit(limit)
-    )
-    products = result.scalars().all()
-    return products
+    cache_key = (skip, limit)
+    payload = _products_cache.get(cache_key)
+    if payload is None:
+        # Списку нужны только колонки: выборка Row-кортежей обходит
+        # дорогую гидратацию полноценных ORM-объектов
+        result = await db.execute(
+            select(Product.id, Product.name, Product.price, Product.seller_id)
+            .offset(skip).limit(limit)
+        )
+        payload = [
+            ProductRead.model_validate(row).model_dump() for row in result.all()
+        ]
+        _products_cache[cache_key] = payload
+    return ORJSONResponse(payload)
 
 @app.get("/products/{product_id}", response_model=ProductRead,
          summary="Получить товар по ID",
          description="Возвращает информацию о конкретном товаре. Доступно всем.")
 async def get_product(
     product_id: int,
-    db: AsyncSession = Depends(get_session)
+    db: SessionDep
 ):
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
-    product = result.scalar_one_or_none()
-    
-    if product is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Товар не найден"
-        )
-    
-    return product
+    payload = _products_cache.get(product_id)
+    if payload is None:
+        product = await db.get(Product, product_id)
+
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Товар не найден"
+            )
+        payload = ProductRead.model_validate(product).model_dump()
+        _products_cache[product_id] = payload
+
+    return ORJSONResponse(payload)
 
 @app.post("/products", response_model=ProductRead,
           status_code=status.HTTP_201_CREATED,
@@ -263,13 +313,10 @@ async def get_product(
           description="Создание нового товара. Требуются права администратора.")
 async def create_product(
     product_data: ProductCreate,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     admin_data: dict = Depends(get_current_admin)
 ):
-    result = await db.execute(
-        select(Seller).where(Seller.id == product_data.seller_id)
-    )
-    seller = result.scalar_one_or_none()
+    seller = await db.get(Seller, product_data.seller_id)
     
     if seller is None:
         raise HTTPException(
@@ -277,12 +324,6 @@ async def create_product(
             detail="Указанный продавец не существует"
         )
     
-    if product_data.price <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Цена должна быть положительным числом"
-        )
-    
     product = Product(
         name=product_data.name,
         price=product_data.price,
@@ -292,7 +333,8 @@ async def create_product(
     db.add(product)
     await db.commit()
     await db.refresh(product)
-    
+    _products_cache.clear()
+
     return product
 
 @app.put("/products/{product_id}", response_model=ProductRead,
@@ -301,25 +343,11 @@ async def create_product(
 async def update_product(
     product_id: int,
     product_data: ProductUpdate,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     admin_data: dict = Depends(get_current_admin)
 ):
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
-    product = result.scalar_one_or_none()
-    
-    if product is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Товар не найден"
-        )
-    
     if product_data.seller_id is not None:
-        result = await db.execute(
-            select(Seller).where(Seller.id == product_data.seller_id)
-        )
-        seller = result.scalar_one_or_none()
+        seller = await db.get(Seller, product_data.seller_id)
         
         if seller is None:
             raise HTTPException(
@@ -327,19 +355,35 @@ async def update_product(
                 detail="Указанный продавец не существует"
             )
     
-    if product_data.price is not None and product_data.price <= 0:
+    update_data = product_data.model_dump(exclude_unset=True)
+    if not update_data:
+        # Пустой PATCH-подобный запрос: менять нечего, просто отдаём товар
+        product = await db.get(Product, product_id)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Товар не найден"
+            )
+        return product
+
+    # Один UPDATE ... RETURNING вместо пары SELECT + UPDATE + refresh
+    result = await db.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .values(**update_data)
+        .returning(Product)
+    )
+    product = result.scalar_one_or_none()
+
+    if product is None:
         raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Цена должна быть положительным числом"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Товар не найден"
         )
-    
-    update_data = product_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(product, field, value)
-    
+
     await db.commit()
-    await db.refresh(product)
-    
+    _products_cache.clear()
+
     return product
 
 @app.delete("/products/{product_id}",
@@ -348,13 +392,10 @@ async def update_product(
             description="Удаление товара. Требуются права администратора.")
 async def delete_product(
     product_id: int,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     admin_data: dict = Depends(get_current_admin)
 ):
-    result = await db.execute(
-        select(Product).where(Product.id == product_id)
-    )
-    product = result.scalar_one_or_none()
+    product = await db.get(Product, product_id)
     
     if product is None:
         raise HTTPException(
@@ -364,7 +405,8 @@ async def delete_product(
     
     await db.delete(product)
     await db.commit()
-    
+    _products_cache.clear()
+
     return None
 
 # SELLER
@@ -373,35 +415,43 @@ async def delete_product(
          summary="Получить список продавцов",
          description="Возвращает список всех продавцов с их комиссиями")
 async def get_sellers(
+    db: SessionDep,
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_session)
+    limit: int = Query(100, ge=1, le=500)
 ):
-    result = await db.execute(
-        select(Seller).offset(skip).limit(limit)
-    )
-    sellers = result.scalars().all()
-    return sellers
+    cache_key = (skip, limit)
+    payload = _sellers_cache.get(cache_key)
+    if payload is None:
+        result = await db.execute(
+            select(Seller.id, Seller.name, Seller.commission_percent)
+            .offset(skip).limit(limit)
+        )
+        payload = [
+            SellerRead.model_validate(row).model_dump() for row in result.all()
+        ]
+        _sellers_cache[cache_key] = payload
+    return ORJSONResponse(payload)
 
 @app.get("/sellers/{seller_id}", response_model=SellerRead,
          summary="Получить продавца по ID",
          description="Возвращает информацию о конкретном продавце")
 async def get_seller(
     seller_id: int,
-    db: AsyncSession = Depends(get_session)
+    db: SessionDep
 ):
-    result = await db.execute(
-        select(Seller).where(Seller.id == seller_id)
-    )
-    seller = result.scalar_one_or_none()
-    
-    if seller is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Продавец не найден"
-        )
-    
-    return seller
+    payload = _sellers_cache.get(seller_id)
+    if payload is None:
+        seller = await db.get(Seller, seller_id)
+
+        if seller is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Продавец не найден"
+            )
+        payload = SellerRead.model_validate(seller).model_dump()
+        _sellers_cache[seller_id] = payload
+
+    return ORJSONResponse(payload)
 
 @app.post("/sellers", response_model=SellerRead,
           status_code=status.HTTP_201_CREATED,
@@ -409,15 +459,9 @@ async def get_seller(
           description="Создание нового продавца. Требуются права администратора.")
 async def create_seller(
     seller_data: SellerCreate,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     admin_data: dict = Depends(get_current_admin)
 ):
-    if not 0 <= seller_data.commission_percent <= 100:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Комиссия должна быть от 0 до 100 процентов"
-        )
-    
     seller = Seller(
         name=seller_data.name,
         commission_percent=seller_data.commission_percent
@@ -426,7 +470,8 @@ async def create_seller(
     db.add(seller)
     await db.commit()
     await db.refresh(seller)
-    
+    _sellers_cache.clear()
+
     return seller
 
 @app.delete("/sellers/{sellers_id}",
@@ -435,13 +480,10 @@ async def create_seller(
             description="Удаление продавца. Требуются права администратора.")
 async def delete_seller(
     seller_id: int,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     admin_data: dict = Depends(get_current_admin)
 ):
-    result = await db.execute(
-        select(Seller).where(Seller.id == seller_id)
-    )
-    seller = result.scalar_one_or_none()
+    seller = await db.get(Seller, seller_id)
     
     if seller is None:
         raise HTTPException(
@@ -451,25 +493,37 @@ async def delete_seller(
     
     await db.delete(seller)
     await db.commit()
-    
+    _sellers_cache.clear()
+
     return None
 
 # ORDER
 
-@app.get("/orders", response_model=List[OrderRead],
+@app.get("/orders", response_model=OrderPage,
          summary="Получить список заказов",
-         description="Возвращает список всех заказов (Требуются права администратора)")
+         description="Возвращает страницу заказов (Требуются права администратора). "
+                     "Следующая страница запрашивается по next_cursor.")
 async def get_orders(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
     admin_data: dict = Depends(get_current_admin)
 ):
-    result = await db.execute(
-        select(Order).offset(skip).limit(limit)
+    # Keyset-пагинация: WHERE id < cursor отрабатывает за константное время,
+    # а offset заставляет БД прочитать и выбросить все пропущенные строки
+    query = (
+        select(Order.id, Order.user_id, Order.product_id, Order.count,
+               Order.created_at)
+        .order_by(Order.id.desc())
+        .limit(limit)
     )
-    orders = result.scalars().all()
-    return orders
+    if cursor is not None:
+        query = query.where(Order.id < cursor)
+    orders = (await db.execute(query)).all()
+    return {
+        "items": orders,
+        "next_cursor": orders[-1].id if len(orders) == limit else None
+    }
 
 @app.get("/orders/{order_id}", response_model=OrderRead,
          summary="Получить заказ по id",
@@ -477,13 +531,10 @@ async def get_orders(
          )
 async def get_order(
     order_id: int,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     admin_data: dict = Depends(get_current_admin)
 ):
-    result = await db.execute(
-        select(Order).where(Order.id == order_id)
-    )
-    order = result.scalar_one_or_none()
+    order = await db.get(Order, order_id)
 
     if order is None:
         raise HTTPException(
@@ -498,13 +549,10 @@ async def get_order(
           description="Создаёт новый заказ")
 async def create_order(
     order_data: OrderCreate,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     current_user_id: int = Depends(get_current_user)
 ):
-    result = await db.execute(
-        select(Product).where(Product.id == order_data.product_id)
-    )
-    product = result.scalar_one_or_none()
+    product = await db.get(Product, order_data.product_id)
     
     if product is None:
         raise HTTPException(
@@ -512,12 +560,6 @@ async def create_order(
             detail="Указанный продукт не существует"
         )
     
-    if order_data.count <= 0:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Число должно быть больше 0"
-        )
-    
     order = Order(
         user_id=current_user_id,
         product_id=order_data.product_id,
@@ -530,20 +572,30 @@ async def create_order(
     
     return order
 
-@app.get("/my-orders", response_model=List[OrderRead],
+@app.get("/my-orders", response_model=OrderPage,
          summary="Получить мои заказы",
-         description="Возвращает список заказов текущего пользователя")
+         description="Возвращает страницу заказов текущего пользователя. "
+                     "Следующая страница запрашивается по next_cursor.")
 async def get_my_orders(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
     current_user_id: int = Depends(get_current_user)
 ):
-    result = await db.execute(
-        select(Order).where(Order.user_id == current_user_id).offset(skip).limit(limit)
+    query = (
+        select(Order.id, Order.user_id, Order.product_id, Order.count,
+               Order.created_at)
+        .where(Order.user_id == current_user_id)
+        .order_by(Order.id.desc())
+        .limit(limit)
     )
-    orders = result.scalars().all()
-    return orders
+    if cursor is not None:
+        query = query.where(Order.id < cursor)
+    orders = (await db.execute(query)).all()
+    return {
+        "items": orders,
+        "next_cursor": orders[-1].id if len(orders) == limit else None
+    }
 
 @app.delete("/orders/{order_id}",
             status_code=status.HTTP_204_NO_CONTENT,
@@ -551,7 +603,7 @@ async def get_my_orders(
             description="Удаление заказа текущего пользователя")
 async def delete_order(
     order_id: int,
-    db: AsyncSession = Depends(get_session),
+    db: SessionDep,
     current_user_id: int = Depends(get_current_user)
 ):
     result = await db.execute(
@@ -577,396 +629,58 @@ async def delete_order(
 
 # ВЕБ-СТРАНИЦЫ
 
+# Страницы собираются Jinja2-шаблонами с общим base.html, но данных в них
+# нет, поэтому каждый шаблон рендерится ровно один раз при импорте.
+# Тогда же один раз считаются ETag и gzip-версия тела: совпавший
+# If-None-Match даёт пустой 304, а клиентам с gzip в Accept-Encoding
+# уходят готовые сжатые байты без работы компрессора на запрос
+_jinja_env = Environment(
+    loader=FileSystemLoader(Path(__file__).resolve().parent / "templates"),
+    auto_reload=False,
+)
+_PAGES = {}
+for _name in ("home.html", "login.html", "register.html", "me.html", "main.html"):
+    _body = _jinja_env.get_template(_name).render().encode("utf-8")
+    _PAGES[_name] = (
+        _body,
+        gzip.compress(_body, compresslevel=9),
+        '"' + hashlib.md5(_body).hexdigest() + '"',
+    )
+
+_PAGE_CACHE_CONTROL = "public, max-age=300"
+
+def _page_response(request: Request, name: str) -> Response:
+    body, body_gz, etag = _PAGES[name]
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    headers = {
+        "ETag": etag,
+        "Cache-Control": _PAGE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(body_gz, headers=headers)
+    return HTMLResponse(body, headers=headers)
+
 @app.get("/", response_class=HTMLResponse,
          summary="Главная страница",
          description="Домашняя страница API маркетплейса")
-async def home_page():
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Marketplace API</title>
-        <style>
-            body { font-family: Arial; margin: auto; padding: 20px; max-width: 800px; }
-            h1 { text-align: center; }
-            .menu { margin: 20px 0; }
-            .menu a { 
-                display: inline-block; 
-                padding: 10px; 
-                background: #4CAF50; 
-                color: white; 
-                text-decoration: none; 
-                margin: 5px;
-            }
-        </style>
-    </head>
-    <body>
-        <h1>Marketplace API</h1>
-        <div class="menu">
-            <a href="/register-page">Регистрация</a>
-            <a href="/login-page">Вход</a>
-            <a href="/me-page">Личный кабинет</a>
-            <a href="/docs" target="_blank">Документация API</a>
-        </div>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+async def home_page(request: Request):
+    return _page_response(request, "home.html")
 
 @app.get("/login-page", response_class=HTMLResponse)
-async def login_page():
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Вход</title>
-        <style>
-            body { font-family: Arial; margin: auto; padding: 20px; max-width: 400px; }
-            form { margin: 20px 0; }
-            input, button { 
-                width: 100%; 
-                padding: 8px; 
-                margin: 5px 0; 
-            }
-            button { background: #4CAF50; color: white; border: none; }
-            .message { margin: 10px 0; padding: 10px; }
-            .success { background: #d4edda; color: #155724; }
-            .error { background: #f8d7da; color: #721c24; }
-            .link { margin-top: 10px; }
-        </style>
-    </head>
-    <body>
-        <h2>Вход</h2>
-        <form id="loginForm">
-            <input type="email" id="email" placeholder="Email" required>
-            <input type="password" id="password" placeholder="Пароль" required>
-            <button type="submit">Войти</button>
-            <h1>Для входа как админ:</h1>
-            <h3>Логин: admin@example.com</h3>
-            <h3>Пароль: admin123</h3>
-        </form>
-        <div id="message"></div>
-        <div class="link">
-            <a href="/register-page">Нет аккаунта? Зарегистрируйтесь</a>
-        </div>
-        
-        <script>
-            document.getElementById('loginForm').addEventListener('submit', async function(e) {
-                e.preventDefault();
-                
-                const email = document.getElementById('email').value;
-                const password = document.getElementById('password').value;
-                
-                const response = await fetch('/login', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({email: email, password: password})
-                });
-                
-                const resultDiv = document.getElementById('message');
-                resultDiv.className = 'message';
-                
-                if (response.ok) {
-                    const data = await response.json();
-                    localStorage.setItem('marketplace_token', data.access_token);
-                    window.location.href = '/me-page';
-                } else {
-                    const error = await response.json();
-                    resultDiv.className = 'message error';
-                    resultDiv.textContent = 'Ошибка: ' + error.detail;
-                }
-            });
-            
-            document.addEventListener('DOMContentLoaded', function() {
-                const token = localStorage.getItem('marketplace_token');
-                if (token) {
-                    const resultDiv = document.getElementById('message');
-                    resultDiv.className = 'message success';
-                    resultDiv.innerHTML = 'Вы уже вошли в систему!<br><a href="/me-page">Личный кабинет</a>';
-                }
-            });
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+async def login_page(request: Request):
+    return _page_response(request, "login.html")
 
 @app.get("/register-page", response_class=HTMLResponse)
-async def register_page():
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Регистрация</title>
-        <style>
-            body { font-family: Arial; margin: auto; padding: 20px; max-width: 400px; }
-            form { margin: 20px 0; }
-            input, button { 
-                width: 100%; 
-                padding: 8px; 
-                margin: 5px 0; 
-            }
-            button { background: #4CAF50; color: white; border: none; }
-            .message { margin: 10px 0; padding: 10px; }
-            .success { background: #d4edda; color: #155724; }
-            .error { background: #f8d7da; color: #721c24; }
-            .link { margin-top: 10px; }
-            .small { font-size: 12px; color: #666; }
-        </style>
-    </head>
-    <body>
-        <h2>Регистрация</h2>
-        <form id="registerForm">
-            <input type="text" id="username" placeholder="Имя пользователя" required>
-            <div class="small">Минимум 3 символа, только буквы, цифры и _</div>
-            <input type="email" id="email" placeholder="Email" required>
-            <input type="password" id="password" placeholder="Пароль" required>
-            <div class="small">Минимум 8 символов, цифра и буква</div>
-            <button type="submit">Зарегистрироваться</button>
-        </form>
-        <div id="message"></div>
-        <div class="link">
-            <a href="/login-page">Уже есть аккаунт? Войдите</a>
-        </div>
-        
-        <script>
-            document.getElementById('registerForm').addEventListener('submit', async function(e) {
-                e.preventDefault();
-                
-                const username = document.getElementById('username').value;
-                const email = document.getElementById('email').value;
-                const password = document.getElementById('password').value;
-                
-                const response = await fetch('/register', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({username: username, email: email, password: password})
-                });
-                
-                const resultDiv = document.getElementById('message');
-                resultDiv.className = 'message';
-                
-                if (response.ok) {
-                    resultDiv.className = 'message success';
-                    resultDiv.innerHTML = 'Регистрация успешна! Переход на страницу входа...';
-                    setTimeout(() => window.location.href = '/login-page', 2000);
-                } else {
-                    const error = await response.json();
-                    resultDiv.className = 'message error';
-                    resultDiv.textContent = 'Ошибка: ' + error.detail;
-                }
-            });
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+async def register_page(request: Request):
+    return _page_response(request, "register.html")
 
 @app.get("/me-page", response_class=HTMLResponse)
-async def me_page():
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Личный кабинет</title>
-        <style>
-            body { font-family: Arial; margin: auto; padding: 20px; max-width: 600px; }
-            .section { margin: 20px 0; padding: 15px; border: 1px solid #ddd; }
-            button { 
-                padding: 8px; 
-                margin: 5px; 
-                background: #4CAF50; 
-                color: white; 
-                border: none; 
-            }
-            .admin-btn { background: #5c7fdf; }
-            textarea { width: 100%; height: 80px; padding: 8px; }
-            .message { margin: 10px 0; padding: 10px; }
-            .success { background: #d4edda; color: #155724; }
-            .error { background: #f8d7da; color: #721c24; }
-            .info { margin: 5px 0; padding: 8px; background: #f0f0f0; }
-        </style>
-    </head>
-    <body>
-        <h2>Личный кабинет</h2>
-        
-        <div class="section">
-            <h3>Информация о пользователе:</h3>
-            <div id="userData"></div>
-        </div>
-        
-        <div class="section">
-            <h3>JWT токен:</h3>
-            <textarea id="tokenDisplay" readonly></textarea>
-            <div>
-                <button onclick="copyToken()">Скопировать токен</button>
-                <button onclick="loadUserData()">Обновить данные</button>
-            </div>
-        </div>
-        
-        <div>
-            <button onclick="window.location.href='/'">На главную</button>
-            <button onclick="logout()">Выйти</button>
-            <button id="mainButton" style="display:none;"
-                    onclick="window.location.href='/main'">Функционал</button>
-        </div>
-        
-        <div id="message"></div>
-        
-        <script>
-            document.addEventListener('DOMContentLoaded', function() {
-                const userToken = localStorage.getItem('marketplace_token');
-                if (userToken) {
-                    document.getElementById('tokenDisplay').value = userToken;
-                    loadUserData();
-                } else {
-                    document.getElementById('userData').innerHTML = '<div class="error">Токен не найден. Войдите в систему.</div>';
-                }
-            });
-            
-            async function loadUserData() {
-                const token = localStorage.getItem('marketplace_token');
-                if (!token) {
-                    showMessage('Токен не найден', 'error');
-                    return;
-                }
-                
-                try {
-                    const response = await fetch('/me', {
-                        headers: {'Authorization': 'Bearer ' + token}
-                    });
-                    
-                    if (response.ok) {
-                        const user = await response.json();
-                        document.getElementById('userData').innerHTML = `
-                            <div class="info">ID: ${user.id}</div>
-                            <div class="info">Имя: ${user.username}</div>
-                            <div class="info">Email: ${user.email}</div>
-                            <div class="info">Админ: ${user.is_admin ? 'Да' : 'Нет'}</div>
-                        `;
-                        document.getElementById('mainButton').style.display = 'inline-block';
-                        showMessage('Данные обновлены', 'success');
-                    } else {
-                        const error = await response.json();
-                        showMessage('Ошибка: ' + error.detail, 'error');
-                        
-                        if (response.status === 401) {
-                            localStorage.removeItem('marketplace_token');
-                            setTimeout(() => window.location.href = '/login-page', 2000);
-                        }
-                    }
-                } catch (error) {
-                    showMessage('Ошибка сети', 'error');
-                }
-            }
-            
-            function copyToken() {
-                const token = document.getElementById('tokenDisplay').value;
-                if (token) {
-                    navigator.clipboard.writeText(token);
-                    showMessage('Токен скопирован!', 'success');
-                }
-            }
-            
-            function showMessage(text, type) {
-                const messageDiv = document.getElementById('message');
-                messageDiv.textContent = text;
-                messageDiv.className = 'message ' + type;
-                setTimeout(() => messageDiv.className = 'message', 3000);
-            }
-            
-            function logout() {
-                localStorage.removeItem('marketplace_token');
-                window.location.href = '/login-page';
-            }
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
+async def me_page(request: Request):
+    return _page_response(request, "me.html")
 
 @app.get("/main", response_class=HTMLResponse)
-async def main_page():
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Главная - Marketplace</title>
-        <style>
-            body { font-family: Arial; margin: auto; padding: 20px; max-width: 800px; }
-            .menu { margin: 20px 0; }
-            .menu a { 
-                display: inline-block; 
-                padding: 10px; 
-                background: #4CAF50; 
-                color: white; 
-                text-decoration: none; 
-                margin: 5px;
-            }
-            .card { 
-                border: 1px solid #ddd; 
-                padding: 15px; 
-                margin: 10px 0; 
-                border-radius: 5px;
-            }
-            .admin-only { color: #dc3545; font-weight: bold; }
-        </style>
-    </head>
-    <body>
-        <h1>Добро пожаловать в Marketplace!</h1>
-        
-        <div class="menu">
-            <h3>Доступные действия:</h3>
-            <a href="/products" target="_blank">Просмотреть товары</a>
-            <a href="/docs" target="_blank">Документация API</a>
-            <a href="/me-page">Личный кабинет</a>
-        </div>
-        
-        <div class="card">
-            <h3>Система прав доступа:</h3>
-            <ul>
-                <li><strong>Все пользователи:</strong>
-                    <ul>
-                        <li>Просмотр товаров (GET /products)</li>
-                        <li>Просмотр продавцов (GET /sellers)</li>
-                        <li>Регистрация и вход</li>
-                    </ul>
-                </li>
-                <li><strong>Аутентифицированные пользователи:</strong>
-                    <ul>
-                        <li>Создание заказов (POST /orders)</li>
-                        <li>Просмотр своих заказов (GET /orders)</li>
-                    </ul>
-                </li>
-                <li class="admin-only"><strong>Только администраторы:</strong>
-                    <ul>
-                        <li>Создание товаров (POST /products)</li>
-                        <li>Обновление товаров (PUT /products/{id})</li>
-                        <li>Удаление товаров (DELETE /products/{id})</li>
-                        <li>Создание продавцов (POST /sellers)</li>
-                    </ul>
-                </li>
-            </ul>
-        </div>
-        
-        <div class="card">
-            <h3>Доступные эндпоинты API:</h3>
-            <ul>
-                <li><strong>GET /products</strong> - список товаров <em>(всем)</em></li>
-                <li><strong>GET /products/{id}</strong> - товар по ID <em>(всем)</em></li>
-                <li class="admin-only"><strong>POST /products</strong> - создать товар <em>(только админы)</em></li>
-                <li class="admin-only"><strong>PUT /products/{id}</strong> - обновить товар <em>(только админы)</em></li>
-                <li class="admin-only"><strong>DELETE /products/{id}</strong> - удалить товар <em>(только админы)</em></li>
-                <li><strong>GET /sellers</strong> - список продавцов <em>(всем)</em></li>
-                <li><strong>GET /sellers/{id}</strong> - продавец по ID <em>(всем)</em></li>
-                <li class="admin-only"><strong>POST /sellers</strong> - создать продавца <em>(только админы)</em></li>
-                <li><strong>GET /orders</strong> - мои заказы <em>(только аутентифицированные)</em></li>
-                <li><strong>POST /orders</strong> - создать заказ <em>(только аутентифицированные)</em></li>
-            </ul>
-        </div>
-        
-        <button onclick="window.location.href='/'">На главную страницу</button>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html_content)
\ No newline at end of file
+async def main_page(request: Request):
+    return _page_response(request, "main.html")
\ No newline at end of file
@@ -1,15 +1,27 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
-from app.database import Base
 from datetime import datetime
 
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        CheckConstraint("count > 0", name="orders_count_positive"),
+        # Покрывает выборку /my-orders: WHERE user_id = ? AND id < cursor
+        # ORDER BY id DESC читается прямо из индекса, без сортировки
+        Index("ix_orders_user_id_id", "user_id", "id"),
+    )
 
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
-    count = Column(Integer, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    count: Mapped[int] = mapped_column()
+    # Время проставляет сама БД: Python не тратится на datetime.now()
+    # на каждую вставку, а пакетные INSERT идут без параметра времени
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
 
-    user = relationship("User")
-    product = relationship("Product")
\ No newline at end of file
+    user: Mapped["User"] = relationship("User")
+    product: Mapped["Product"] = relationship("Product")
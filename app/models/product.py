@@ -1,13 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import CheckConstraint, Float, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        CheckConstraint("price > 0", name="products_price_positive"),
+    )
 
-    id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
-    price = Column(Float, nullable=False)
-    seller_id = Column(Integer, ForeignKey("sellers.id"), nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    price: Mapped[float] = mapped_column(Float)
+    seller_id: Mapped[int] = mapped_column(ForeignKey("sellers.id"))
 
-    seller = relationship("Seller")
\ No newline at end of file
+    seller: Mapped["Seller"] = relationship("Seller")
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import CheckConstraint, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
 class Seller(Base):
     __tablename__ = "sellers"
+    __table_args__ = (
+        CheckConstraint(
+            "commission_percent >= 0 AND commission_percent <= 100",
+            name="sellers_commission_range"
+        ),
+    )
 
-    id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
-    commission_percent = Column(Float, nullable=False)
\ No newline at end of file
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True, index=True)
+    commission_percent: Mapped[float] = mapped_column(Float)
@@ -1,10 +1,10 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
 from datetime import datetime
 
 class OrderBase(BaseModel):
     product_id: int
-    count: int
+    count: int = Field(gt=0)
 
 class OrderCreate(OrderBase):
     pass
@@ -12,6 +12,10 @@ class OrderCreate(OrderBase):
 class OrderRead(OrderBase):
     id: int
     user_id: int
+    created_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderPage(BaseModel):
+    items: List[OrderRead]
+    next_cursor: Optional[int] = None
\ No newline at end of file
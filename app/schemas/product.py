@@ -1,9 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 class ProductBase(BaseModel):
     name: str
-    price: float
+    price: float = Field(gt=0)
 
 class ProductCreate(ProductBase):
     seller_id: int
@@ -12,13 +12,9 @@ class ProductRead(ProductBase):
     id: int
     seller_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ProductUpdate(BaseModel):
     name: Optional[str] = None
-    price: Optional[float] = None
-    seller_id: Optional[int] = None
-
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    price: Optional[float] = Field(None, gt=0)
+    seller_id: Optional[int] = None
\ No newline at end of file
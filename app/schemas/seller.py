@@ -1,8 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 class SellerBase(BaseModel):
     name: str
-    commission_percent: float
+    commission_percent: float = Field(ge=0, le=100)
 
 class SellerCreate(SellerBase):
     pass
@@ -10,5 +10,4 @@ class SellerCreate(SellerBase):
 class SellerRead(SellerBase):
     id: int
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,18 +1,79 @@
-from passlib.context import CryptContext
+import hashlib
+import os
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import anyio
+import anyio.to_thread
+import bcrypt
+from cachetools import TTLCache
+
+from app.config import settings
+
+# C-расширение bcrypt вызывается напрямую, без passlib: диспетчеризация
+# CryptContext добавляла интерпретаторный оверхед на каждый вызов.
+# Число раундов настраивается через BCRYPT_ROUNDS (по умолчанию 12)
+
+def _truncate(password: str) -> bytes:
+    # bcrypt учитывает только первые 72 байта пароля
+    password_bytes = password.encode('utf-8')
+    if len(password_bytes) > 72:
+        password_bytes = password_bytes[:72]
+    return password_bytes
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Проверяет, соответствует ли обычный пароль хешированному
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return bcrypt.checkpw(_truncate(plain_password), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
     """
     Хеширует пароль
     """
-    password_bytes = password.encode('utf-8')
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    return pwd_context.hash(password_bytes)
\ No newline at end of file
+    return bcrypt.hashpw(
+        _truncate(password), bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    ).decode('utf-8')
+
+# Хеш-пустышка: /login сверяет с ним пароль, когда email не найден,
+# чтобы время ответа не выдавало существование аккаунта
+DUMMY_PASSWORD_HASH = get_password_hash("dummy-password")
+
+# bcrypt занимает десятки миллисекунд чистого CPU и отпускает GIL,
+# поэтому из асинхронных обработчиков его нужно уводить в threadpool,
+# иначе один логин блокирует весь event loop на время хеширования.
+# Лимитер не пускает в работу больше хешей, чем ядер: лишние запросы
+# ждут в очереди вместо того, чтобы толкаться за кэши процессора
+_KDF_LIMITER = anyio.CapacityLimiter(os.cpu_count() or 4)
+
+# Кэш успешных проверок для сервисных учёток со стабильными кредами:
+# включается явно через VERIFY_CACHE=1 и по умолчанию выключен, чтобы не
+# менять профиль безопасности обычных логинов. Ключ - sha256 пароля плюс
+# сам хеш, открытый пароль в памяти не хранится; неудачные проверки не
+# кэшируются - перебор по-прежнему платит полную цену bcrypt
+_VERIFY_CACHE = TTLCache(maxsize=10_000, ttl=60)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Асинхронная обёртка verify_password: хеширование идёт в threadpool
+    """
+    if not settings.verify_cache_enabled:
+        return await anyio.to_thread.run_sync(
+            verify_password, plain_password, hashed_password, limiter=_KDF_LIMITER
+        )
+
+    cache_key = (hashlib.sha256(plain_password.encode()).digest(), hashed_password)
+    if _VERIFY_CACHE.get(cache_key):
+        return True
+    ok = await anyio.to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=_KDF_LIMITER
+    )
+    if ok:
+        _VERIFY_CACHE[cache_key] = True
+    return ok
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Асинхронная обёртка get_password_hash: хеширование идёт в threadpool
+    """
+    return await anyio.to_thread.run_sync(
+        get_password_hash, password, limiter=_KDF_LIMITER
+    )
\ No newline at end of file